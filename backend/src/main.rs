@@ -61,6 +61,22 @@ async fn main() {
     let version = env!("CARGO_PKG_VERSION");
     tracing::info!("📸 Deck Screenshot Viewer v{}", version);
 
+    let host_at = std::env::var("HOST").unwrap_or("127.0.0.1".to_string());
+    let port_at = std::env::var("PORT").unwrap_or("5158".to_string());
+
+    // Bind before loading the Steam data so the plugin hears about port conflicts right away
+    let listener = match TcpListener::bind(format!("{}:{}", host_at, port_at)).await {
+        Ok(listener) => listener,
+        Err(e) => {
+            tracing::error!("💥 Failed to bind to {}:{}: {}", host_at, port_at, e);
+            std::process::exit(1);
+        }
+    };
+
+    let local_addr = listener.local_addr().unwrap();
+    // Startup marker for the plugin, which waits for it instead of pre-checking the port
+    println!("LISTENING {}", local_addr);
+
     let steam_root = dunce::canonicalize(steam::get_steam_root_path()).unwrap();
     tracing::info!("Steam root path: {:?}", steam_root);
 
@@ -130,18 +146,8 @@ async fn main() {
 
     let app = app.fallback(handle_404);
 
-    let host_at = std::env::var("HOST").unwrap_or("127.0.0.1".to_string());
-    let port_at = std::env::var("PORT").unwrap_or("5158".to_string());
-
     // run it
-    let listener = TcpListener::bind(format!("{}:{}", host_at, port_at))
-        .await
-        .unwrap();
-
-    tracing::info!(
-        "🚀 Fast serving at: http://{}",
-        listener.local_addr().unwrap()
-    );
+    tracing::info!("🚀 Fast serving at: http://{}", local_addr);
     axum::serve(listener, app).await.unwrap();
 }
 
@@ -12,29 +12,69 @@ settings = SettingsManager(
 settings.read()
 
 
-def is_port_in_use(port: int | str) -> bool:
-    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
-        return s.connect_ex(("localhost", int(port))) == 0
+def get_primary_address() -> str | None:
+    """Address of the interface that routes to the outside world (usually Wi-Fi), None if there is no route"""
+    with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as s:
+        try:
+            # Connecting a UDP socket only picks a route, no packet is sent
+            s.connect(("10.255.255.255", 1))
+            return s.getsockname()[0]
+        except OSError:
+            return None
+
+
+ADDRESS_CHANGED_ERROR = "Network address changed, restart the server"
+
+
+def is_failure_line(line: str) -> bool:
+    """Whether a backend output line explains a failure (tracing ERROR event or a Rust panic)"""
+    return " ERROR " in line or "panicked at" in line
 
 
 class Plugin:
     backend: asyncio.subprocess.Process | None = None
     server_running = False
     _watchdog_task = None
+    _drain_task: asyncio.Task | None = None
+    _backend_changed = asyncio.Event()
+    _start_lock = asyncio.Lock()
     error: str | None = None
+    _bind_addr: str | None = None
+    _settings_dirty = False
+    _flush_handle: asyncio.TimerHandle | None = None
+    _port: int = 5158
+    _accepted: bool = False
+    _backoff: float = 1.0
+    _last_failure: str = ""
 
     async def watchdog(self):
         while True:
-            await asyncio.sleep(1)
             try:
-                if not self.backend:
+                backend = self.backend
+                if backend is None:
+                    # Sleep until start_server hands us a new process
+                    await self._backend_changed.wait()
                     continue
-                if self.backend.returncode is None:
+                await backend.wait()
+                if self.backend is not backend:
+                    # Stopped or replaced by start_server itself
                     continue
+                if self._drain_task:
+                    # Let the drain task catch up with the final lines before reading them
+                    await asyncio.wait({self._drain_task}, timeout=1.0)
+                error = Plugin._describe_exit(self, backend.returncode, self._last_failure)
+                decky_plugin.logger.error(f"watchdog: Rust backend exited with code {backend.returncode}")
                 await Plugin.start_server(self, False)
+                # start_server clears the error, keep the reason the backend died visible
+                Plugin.set_error(self, error)
+                self._backoff = 1.0
+            except asyncio.CancelledError:
+                raise
             except Exception as e:
+                # Keep watching, a dead watchdog means the backend is never recovered again
                 decky_plugin.logger.error(f"Watchdog error: {e}", exc_info=e)
-                raise e
+                await asyncio.sleep(self._backoff)
+                self._backoff = min(self._backoff * 2, 30.0)
 
     async def start_server(self, enable: bool = True) -> bool:
         """Start or stop the Rust backend server
@@ -45,51 +85,160 @@ class Plugin:
         Returns:
             bool: True if the server is running, False otherwise
         """
-        try:
-            Plugin.set_error(self, None)
-            if enable == self.server_running:
-                decky_plugin.logger.info("start_server: Server already running")
-                return True
-            if enable:
-                use_port = await Plugin.get_port(self)
-                if is_port_in_use(use_port):
-                    Plugin.set_error(self, "Port is already in use")
+        # Serialize start/stop, a second call during the LISTENING wait would spawn another backend
+        async with self._start_lock:
+            try:
+                Plugin.set_error(self, None)
+                if enable == self.server_running:
+                    decky_plugin.logger.info("start_server: Server already running")
+                    return True
+                if enable:
+                    use_port = await Plugin.get_port(self)
+                    self._bind_addr = get_primary_address()
+                    if self._bind_addr is None:
+                        # A loopback-only server is useless, nothing else could reach it
+                        Plugin.set_error(self, "No network connection")
+                        return False
+                    decky_plugin.logger.info("start_server: Starting Rust backend...")
+                    backend = await asyncio.create_subprocess_exec(
+                        f"{decky_plugin.DECKY_PLUGIN_DIR}/bin/backend",
+                        env={
+                            "HOST": self._bind_addr,
+                            "PORT": str(use_port),
+                            "DECKY_PLUGIN_DIR": decky_plugin.DECKY_PLUGIN_DIR,
+                            "DECKY_LOG_INTO": decky_plugin.DECKY_PLUGIN_LOG_DIR,
+                            "HOME": decky_plugin.HOME,
+                            "NO_COLOR": "1",
+                        },
+                        stdout=asyncio.subprocess.PIPE,
+                        stderr=asyncio.subprocess.STDOUT,
+                    )
+                    # Let the backend bind the port itself instead of racing it with a pre-check
+                    try:
+                        failure = await Plugin._wait_for_listening(self, backend)
+                    except BaseException:
+                        # Not handed to self.backend yet, nothing else would ever reap it
+                        if backend.returncode is None:
+                            backend.kill()
+                        await backend.wait()
+                        raise
+                    if failure is not None:
+                        decky_plugin.logger.error(f"start_server: Rust backend exited early with code {backend.returncode}")
+                        Plugin.set_error(self, Plugin._describe_exit(self, backend.returncode, failure))
+                        return False
+                    self.backend = backend
+                    # Keep the pipe flowing, otherwise the backend blocks once the buffer is full
+                    self._drain_task = asyncio.get_event_loop().create_task(
+                        Plugin._drain_output(self, backend.stdout)
+                    )
+                    self._backend_changed.set()
+                    self.server_running = True
+                    decky_plugin.logger.info("start_server: Rust backend started")
+                    return True
+                else:
+                    if self.backend:
+                        decky_plugin.logger.info("start_server: Stopping Rust backend...")
+                        try:
+                            await Plugin.kill_server(self)
+                        finally:
+                            # self.backend is already detached, don't get stuck claiming it still runs
+                            self.server_running = False
+                            self._bind_addr = None
+                        decky_plugin.logger.info("start_server: Rust backend stopped")
                     return False
-                decky_plugin.logger.info("start_server: Starting Rust backend...")
-                self.backend = await asyncio.create_subprocess_shell(
-                    f"{decky_plugin.DECKY_PLUGIN_DIR}/bin/backend",
-                    env={
-                        "HOST": "0.0.0.0",
-                        "PORT": str(use_port),
-                        "DECKY_PLUGIN_DIR": decky_plugin.DECKY_PLUGIN_DIR,
-                        "DECKY_LOG_INTO": decky_plugin.DECKY_PLUGIN_LOG_DIR,
-                        "HOME": decky_plugin.HOME,
-                    },
-                    stdout=asyncio.subprocess.PIPE,
-                    stderr=asyncio.subprocess.PIPE,
-                )
-                self.server_running = True
-                decky_plugin.logger.info("start_server: Rust backend started")
-                return True
-            else:
-                if self.backend:
-                    decky_plugin.logger.info("start_server: Stopping Rust backend...")
-                    self.backend.terminate()
-                    await self.backend.wait()
-                    self.backend = None
-                    self.server_running = False
-                    decky_plugin.logger.info("start_server: Rust backend stopped")
-                return False
-        except Exception as e:
-            decky_plugin.logger.error(f"Error starting/stopping server: {e}", exc_info=e)
-            raise e
+            except Exception as e:
+                decky_plugin.logger.error(f"Error starting/stopping server: {e}", exc_info=e)
+                raise e
+
+    async def kill_server(self) -> None:
+        """Terminate the Rust backend, escalating to SIGKILL if it does not exit in time"""
+        # Detach first so the watchdog does not treat this as a crash
+        backend = self.backend
+        self.backend = None
+        self._backend_changed.clear()
+        if backend is None:
+            return
+        try:
+            if backend.returncode is None:
+                backend.terminate()
+            try:
+                async with asyncio.timeout(10.0):
+                    await backend.wait()
+            except TimeoutError:
+                decky_plugin.logger.warning("kill_server: Rust backend did not terminate, killing it")
+                backend.kill()
+                async with asyncio.timeout(10.0):
+                    await backend.wait()
+        finally:
+            if self._drain_task:
+                self._drain_task.cancel()
+                self._drain_task = None
+
+    async def _wait_for_listening(self, backend: asyncio.subprocess.Process) -> str | None:
+        """Wait until the backend reports that it is listening
+
+        Returns:
+            str | None: The last failure line (may be empty) if the backend exited during startup, None otherwise
+        """
+        self._last_failure = ""
+        try:
+            async with asyncio.timeout(5.0):
+                while True:
+                    try:
+                        line = await backend.stdout.readline()
+                    except ValueError:
+                        continue
+                    if not line:
+                        break
+                    decoded = line.decode(errors="replace").rstrip()
+                    if is_failure_line(decoded):
+                        self._last_failure = decoded
+                    decky_plugin.logger.info(f"backend: {decoded}")
+                    if decoded.startswith("LISTENING "):
+                        return None
+        except TimeoutError:
+            # Slow to come up, the watchdog reports the reason if it dies later
+            return None
+        await backend.wait()
+        return self._last_failure
+
+    async def _drain_output(self, stream: asyncio.StreamReader) -> None:
+        """Keep reading the backend output until the pipe closes, forwarding only warnings and failures
+
+        Everything else is already in backend.log through the backend's own tracing_appender.
+        """
+        while True:
+            try:
+                line = await stream.readline()
+            except ValueError:
+                # Overlong line, readline already discarded it from the buffer
+                continue
+            if not line:
+                break
+            decoded = line.decode(errors="replace").rstrip()
+            if is_failure_line(decoded):
+                self._last_failure = decoded
+                decky_plugin.logger.error(f"backend: {decoded}")
+            elif " WARN " in decoded:
+                decky_plugin.logger.warning(f"backend: {decoded}")
+
+    def _describe_exit(self, returncode: int | None, failure_line: str) -> str:
+        """User facing error for a backend that exited on its own"""
+        if "Address already in use" in failure_line:
+            return "Port is already in use"
+        if failure_line:
+            return failure_line
+        if returncode is not None and returncode < 0:
+            return f"Backend killed by signal {-returncode}"
+        return f"Backend exited with code {returncode}"
 
     async def get_port(self) -> int:
-        return settings.getSetting("PORT", 5158)
+        return self._port
 
     async def set_port(self, port: int) -> int:
-        settings.setSetting("PORT", int(port))
-        settings.commit()
+        self._port = int(port)
+        settings.setSetting("PORT", self._port)
+        Plugin._mark_settings_dirty(self)
         return port
 
     async def get_error(self) -> str | None:
@@ -99,26 +248,54 @@ class Plugin:
         self.error = error
 
     async def get_accepted_warning(self) -> bool:
-        return settings.getSetting("ACCEPTED_WARNING", False)
+        return self._accepted
 
     async def set_accepted_warning(self) -> None:
         decky_plugin.logger.info("Accepted warning")
+        self._accepted = True
         settings.setSetting("ACCEPTED_WARNING", True)
+        Plugin._mark_settings_dirty(self)
+
+    def _mark_settings_dirty(self) -> None:
+        """Schedule a settings commit, coalescing bursts of changes into one write"""
+        self._settings_dirty = True
+        if self._flush_handle:
+            self._flush_handle.cancel()
+        loop = asyncio.get_event_loop()
+        self._flush_handle = loop.call_later(2.0, Plugin._flush_settings, self)
+
+    def _flush_settings(self) -> None:
+        if self._flush_handle:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        if not self._settings_dirty:
+            return
         settings.commit()
+        self._settings_dirty = False
 
     async def get_ip_address(self):
-        return socket.gethostbyname(socket.gethostname())
+        # Pinned to the address the backend listens on while it runs, otherwise follow the network
+        current = get_primary_address()
+        if self.server_running and self._bind_addr:
+            # The backend only listens on _bind_addr, a DHCP renewal or network switch strands it
+            if current != self._bind_addr:
+                Plugin.set_error(self, ADDRESS_CHANGED_ERROR)
+            elif self.error == ADDRESS_CHANGED_ERROR:
+                Plugin.set_error(self, None)
+            return self._bind_addr
+        return current or "127.0.0.1"
 
     async def get_server_running(self):
         return self.server_running
 
     async def get_status(self):
+        # Everything except the IP address is a plain attribute, no need to await the getters
         return {
-            "server_running": await Plugin.get_server_running(self),
+            "server_running": self.server_running,
             "ip_address": await Plugin.get_ip_address(self),
-            "port": await Plugin.get_port(self),
-            "accepted_warning": await Plugin.get_accepted_warning(self),
-            "error": await Plugin.get_error(self),
+            "port": self._port,
+            "accepted_warning": self._accepted,
+            "error": self.error,
         }
 
     # Asyncio-compatible long-running code, executed in a task when the plugin is loaded
@@ -126,6 +303,8 @@ class Plugin:
         try:
             if settings.getSetting("PORT") is None:
                 await Plugin.set_port(self, 5158)
+            self._port = int(settings.getSetting("PORT", 5158))
+            self._accepted = bool(settings.getSetting("ACCEPTED_WARNING", False))
 
             decky_plugin.logger.info("deck-screenshot-explorer: loading plugin...")
             loop = asyncio.get_event_loop()
@@ -138,7 +317,17 @@ class Plugin:
     # Function called first during the unload process, utilize this to handle your plugin being removed
     async def _unload(self):
         decky_plugin.logger.info("deck-screenshot-explorer: unloading plugin...")
-        await Plugin.start_server(self, False)
-        if self._watchdog_task:
-            self._watchdog_task.cancel()
+        # Stop the backend through kill_server first, then tear down the watchdog
+        try:
+            await Plugin.start_server(self, False)
+        finally:
+            # Even if stopping failed, don't drop pending settings or leave the watchdog behind
+            Plugin._flush_settings(self)
+            if self._watchdog_task:
+                self._watchdog_task.cancel()
+                try:
+                    await self._watchdog_task
+                except asyncio.CancelledError:
+                    pass
+                self._watchdog_task = None
         decky_plugin.logger.info("deck-screenshot-explorer: plugin unloaded")
@@ -1,8 +1,11 @@
 # A manual script to package the contents of a directory into a zip file
 
 import json
+import os
+import zlib
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
-from zipfile import ZipFile
+from zipfile import ZIP_DEFLATED, ZipFile, ZipInfo
 
 ROOT_DIR = Path(__file__).resolve().parent.parent
 
@@ -11,30 +14,70 @@ DIST_FOLDER = ROOT_DIR / "dist"
 BACKEND_FOLDER = ROOT_DIR / "backend"
 DEFAULTS_FOLDER = ROOT_DIR / "defaults"
 
-package_data = json.loads(PACKAGE_JSON.read_text())
+COMPRESS_LEVEL = 6
 
-name = package_data["name"]
-version = package_data["version"]
-output_file = ROOT_DIR / f"{name}-v{version}.zip"
 
-with ZipFile(output_file, "w") as zipf:
-    # Write root stuff
-    zipf.write(PACKAGE_JSON, f"{name}/package.json")
-    zipf.write(ROOT_DIR / "README.md", f"{name}/README.md")
-    zipf.write(ROOT_DIR / "LICENSE", f"{name}/LICENSE")
-    zipf.write(ROOT_DIR / "main.py", f"{name}/main.py")
-    zipf.write(ROOT_DIR / "plugin.json", f"{name}/plugin.json")
+def compress_file(source: str | Path) -> tuple[int, int, bytes]:
+    """Raw-deflate a file, returns (crc32, uncompressed size, compressed data)"""
+    with open(source, "rb") as fp:
+        data = fp.read()
+    # Negative wbits gives a raw deflate stream without the zlib header, which is what zip stores
+    compressor = zlib.compressobj(COMPRESS_LEVEL, zlib.DEFLATED, -zlib.MAX_WBITS)
+    compressed = compressor.compress(data) + compressor.flush()
+    return zlib.crc32(data), len(data), compressed
 
-    # Write binary
-    zipf.write(BACKEND_FOLDER / "out" / "backend", f"{name}/bin/backend")
 
-    # Write dist folder
-    for file in DIST_FOLDER.rglob("*"):
-        if file.is_file():
-            zipf.write(file, f"{name}/dist/{file.relative_to(DIST_FOLDER)}")
+def write_compressed(zipf: ZipFile, source: str | Path, arcname: str, result: tuple[int, int, bytes]) -> None:
+    """Append an already deflated member, ZipFile has no public API to skip its own compression"""
+    crc, file_size, compressed = result
+    zinfo = ZipInfo.from_file(source, arcname)
+    zinfo.compress_type = ZIP_DEFLATED
+    zinfo.CRC = crc
+    zinfo.file_size = file_size
+    zinfo.compress_size = len(compressed)
+    zinfo.header_offset = zipf.fp.tell()
+    zipf.fp.write(zinfo.FileHeader())
+    zipf.fp.write(compressed)
+    zipf.filelist.append(zinfo)
+    zipf.NameToInfo[zinfo.filename] = zinfo
+    zipf.start_dir = zipf.fp.tell()
+    zipf._didModify = True
 
-    # Write defaults folder (to root)
+
+def main():
+    package_data = json.loads(PACKAGE_JSON.read_text())
+
+    name = package_data["name"]
+    version = package_data["version"]
+    output_file = ROOT_DIR / f"{name}-v{version}.zip"
+
+    # (source, path inside the package)
+    files = [
+        (PACKAGE_JSON, "package.json"),
+        (ROOT_DIR / "README.md", "README.md"),
+        (ROOT_DIR / "LICENSE", "LICENSE"),
+        (ROOT_DIR / "main.py", "main.py"),
+        (ROOT_DIR / "plugin.json", "plugin.json"),
+        (BACKEND_FOLDER / "out" / "backend", "bin/backend"),
+    ]
+
+    # Dist folder, and defaults folder (to root)
     # defaults/file.txt into -> name/file.txt
-    for file in DEFAULTS_FOLDER.rglob("*"):
-        if file.is_file():
-            zipf.write(file, f"{name}/{file.relative_to(DEFAULTS_FOLDER)}")
+    # Plain strings from os.walk, a Path per entry adds up on a dist tree full of small chunks
+    for base, subfolder in [(DIST_FOLDER, "dist/"), (DEFAULTS_FOLDER, "")]:
+        base_str = str(base)
+        prefix_len = len(base_str) + 1
+        for dirpath, _, filenames in os.walk(base_str):
+            for filename in filenames:
+                full_path = os.path.join(dirpath, filename)
+                files.append((full_path, f"{subfolder}{full_path[prefix_len:]}"))
+
+    # Deflate is CPU bound, so compress every member in parallel and only write them out here
+    with ProcessPoolExecutor(max_workers=os.cpu_count()) as executor, ZipFile(output_file, "w") as zipf:
+        results = executor.map(compress_file, [source for source, _ in files], chunksize=8)
+        for (source, target), result in zip(files, results):
+            write_compressed(zipf, source, f"{name}/{target}", result)
+
+
+if __name__ == "__main__":
+    main()